@@ -31,19 +31,39 @@ Exit codes:
 import argparse
 import hashlib
 import json
+import os
 import re
 import subprocess
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Iterator, NamedTuple
+
+try:
+    import pygit2  # optional: in-process git access instead of subprocesses
+except ImportError:
+    pygit2 = None
+
+try:
+    import orjson  # optional: C JSON encoder for the index writes
+except ImportError:
+    orjson = None
+
+try:
+    from blake3 import blake3  # optional: faster fallback content hash
+except ImportError:
+    blake3 = None
 
 INDEX_DIR = Path("docs/_index")
 INDEX_FILE = INDEX_DIR / "docs_index.v1.json"
-INDEX_VERSION = "1.0.0"
+INDEX_VERSION = "1.0.0"  # bump when index_file() output changes, to invalidate reused entries
+
+# Per-doc reads and parsing run on a thread pool (I/O-bound, small docs)
+INDEX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
 FRONTMATTER_RE = re.compile(r"\A---\s*\n(.*?)\n---", re.DOTALL)
 FIELD_RE = re.compile(r"^(\w[\w-]*):\s*(.+)$", re.MULTILINE)
 TITLE_RE = re.compile(r"^#\s+(.+)$", re.MULTILINE)
-LINK_RE = re.compile(r"\[([^\]]*)\]\(([^)]+)\)")
 
 SKIP_PREFIXES = (
     "docs/ephemeral/",
@@ -52,30 +72,107 @@ SKIP_PREFIXES = (
 )
 
 
-def extract_frontmatter(content: str) -> dict[str, str]:
-    """Extract YAML front-matter fields as a flat dict."""
-    match = FRONTMATTER_RE.search(content)
-    if not match:
-        return {}
-    fields = {}
-    for m in FIELD_RE.finditer(match.group(1)):
-        fields[m.group(1).lower()] = m.group(2).strip().strip('"').strip("'")
-    return fields
-
-
-def extract_title(content: str) -> str:
-    """Extract first H1 heading from markdown."""
-    stripped = FRONTMATTER_RE.sub("", content).strip()
-    match = TITLE_RE.search(stripped)
-    return match.group(1).strip() if match else ""
+def walk_files(
+    root: str,
+    skip_dir: Callable[[str, str], bool] | None = None,
+) -> Iterator[str]:
+    """Yield file paths under root, depth-first with names sorted per level.
 
+    Same order as sorted(Path(root).rglob("*")) restricted to files, but a
+    directory for which skip_dir(path, name) is true is never opened.
+    Symlinked directories are not followed (as with rglob).
+    """
 
-def extract_links(content: str, source_path: str) -> list[dict]:
-    """Extract markdown links, resolving relative paths."""
+    def sorted_entries(path: str) -> list[os.DirEntry]:
+        try:
+            with os.scandir(path) as it:
+                return sorted(it, key=lambda e: e.name)
+        except OSError:
+            return []
+
+    stack = [iter(sorted_entries(root))]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+        elif entry.is_dir(follow_symlinks=False):
+            if skip_dir is None or not skip_dir(entry.path, entry.name):
+                stack.append(iter(sorted_entries(entry.path)))
+        elif entry.is_file():
+            yield entry.path
+
+
+class ParsedDoc(NamedTuple):
+    """Structural fields of a markdown doc (see parse_doc)."""
+
+    frontmatter: dict[str, str]
+    title: str
+    links: list[tuple[str, str]]  # (text, target) for every markdown link
+
+
+def parse_doc(content: str, with_links: bool = True) -> ParsedDoc:
+    """Parse front-matter, first H1 heading, and links from a markdown doc.
+
+    The front-matter is matched once and the title search starts where it
+    ends, stopping at the first H1, so only one pass (the link scan) walks
+    the whole document. Links are collected from the start of the document
+    since front-matter values may contain links too.
+    """
+    fields = {}
+    body_offset = 0
+    match = FRONTMATTER_RE.match(content)
+    if match:
+        body_offset = match.end()
+        # Flat `key: value` lines, not a YAML load: values stay raw strings
+        # (no dates/bools/lists), which is what the index records.
+        fields = {
+            key.lower(): value.strip().strip('"').strip("'")
+            for key, value in FIELD_RE.findall(match.group(1))
+        }
+
+    title_match = TITLE_RE.search(content, body_offset)
+    title = title_match.group(1).strip() if title_match else ""
+    links = scan_links(content) if with_links else []
+    return ParsedDoc(fields, title, links)
+
+
+def scan_links(content: str) -> list[tuple[str, str]]:
+    """Find markdown links as (text, target) pairs.
+
+    Same matches as re.findall(r"\[([^\]]*)\]\(([^)]+)\)", content), but
+    jumps between the `[`, `]`, `(`, `)` sentinels with str.find (a C-level
+    memchr scan) instead of stepping the regex engine over every character.
+    """
     links = []
+    find = content.find
+    pos = 0
+    while True:
+        open_bracket = find("[", pos)
+        if open_bracket == -1:
+            return links
+        # Text runs to the first `]`; any `[` in between starts the same failed match
+        close_bracket = find("]", open_bracket + 1)
+        if close_bracket == -1:
+            return links
+        if content.startswith("(", close_bracket + 1):
+            close_paren = find(")", close_bracket + 2)
+            if close_paren == -1:
+                return links
+            if close_paren > close_bracket + 2:  # target must be non-empty
+                links.append((
+                    content[open_bracket + 1:close_bracket],
+                    content[close_bracket + 2:close_paren],
+                ))
+                pos = close_paren + 1
+                continue
+        pos = close_bracket + 1
+
+
+def resolve_links(links: list[tuple[str, str]], source_path: str) -> list[dict]:
+    """Drop external links and resolve relative targets against source_path."""
+    resolved_links = []
     source_dir = str(Path(source_path).parent)
-    for match in LINK_RE.finditer(content):
-        target = match.group(2)
+    for text, target in links:
         if target.startswith(("http://", "https://", "#", "mailto:")):
             continue
         resolved = str(Path(source_dir) / target)
@@ -83,22 +180,69 @@ def extract_links(content: str, source_path: str) -> list[dict]:
             resolved = str(Path(resolved))
         except (ValueError, OSError):
             pass
-        links.append({"text": match.group(1), "target": resolved})
-    return links
+        resolved_links.append({"text": text, "target": resolved})
+    return resolved_links
+
+
+_REPO = None
+
+
+def open_repo():
+    """Return the process-wide pygit2 Repository, or None without pygit2.
+
+    Doc discovery, hashing, and staged reads all share this one handle
+    (and its object database) when pygit2 is installed.
+    """
+    global _REPO
+    if _REPO is None and pygit2 is not None:
+        try:
+            _REPO = pygit2.Repository(".")
+        except pygit2.GitError:
+            pass
+    return _REPO
+
 
+def batch_hash_objects(paths: list[str]) -> dict[str, str]:
+    """Compute git blob shas for many working-tree files in one subprocess.
 
-def content_hash(filepath: str, content: str) -> str:
-    """Compute a stable content hash using git blob sha with sha256 fallback."""
+    Feeds all paths to a single `git hash-object --stdin-paths` instead of
+    forking once per file (or hashes in-process via pygit2). Returns
+    {path: blob_sha}; paths are absent from the result if git is
+    unavailable or rejects the batch.
+    """
+    if not paths:
+        return {}
+    if open_repo() is not None:
+        hashes = {}
+        for path in paths:
+            try:
+                hashes[path] = str(pygit2.hashfile(path))
+            except (OSError, pygit2.GitError):
+                pass
+        return hashes
     try:
-        result = subprocess.run(
-            ["git", "hash-object", filepath],
-            capture_output=True, text=True
+        proc = subprocess.Popen(
+            ["git", "hash-object", "--stdin-paths"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True,
         )
-        if result.returncode == 0 and result.stdout.strip():
-            return result.stdout.strip()[:16]
-    except Exception:
-        pass
-    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+        stdout, _ = proc.communicate("\n".join(paths) + "\n")
+    except OSError:
+        return {}
+    shas = stdout.split()
+    if proc.returncode != 0 or len(shas) != len(paths):
+        return {}
+    return dict(zip(paths, shas))
+
+
+def fallback_hash(data: bytes) -> str:
+    """16-hex content hash for when git cannot supply a blob id.
+
+    Only used off the git path, so it never has to match `git hash-object`.
+    """
+    if blake3 is not None:
+        return blake3(data).hexdigest(length=8)
+    return hashlib.sha256(data).hexdigest()[:16]
 
 
 def content_hash_from_bytes(content: str) -> str:
@@ -112,88 +256,192 @@ def content_hash_from_bytes(content: str) -> str:
             return result.stdout.strip()[:16]
     except Exception:
         pass
-    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+    return fallback_hash(content.encode("utf-8"))
 
 
-def read_staged_content(filepath: str) -> str | None:
-    """Read file content from the git index (staged bytes)."""
-    result = subprocess.run(
-        ["git", "show", f":{filepath}"],
-        capture_output=True, text=True
-    )
-    if result.returncode == 0:
-        return result.stdout
-    return None
+class GitCatFileBatch:
+    """One long-lived `git cat-file --batch` process for reading many objects.
 
+    Use as a context manager. Each get() writes a single ref (e.g.
+    ":docs/foo.md" for staged bytes) and reads the framed response, so N
+    reads cost one process instead of N `git show` forks. With pygit2,
+    reads go straight to the shared repository handle and no process is
+    spawned.
+    """
+
+    def __init__(self):
+        self._proc: subprocess.Popen | None = None
+        self._repo = None
+
+    def __enter__(self) -> "GitCatFileBatch":
+        self._repo = open_repo()
+        if self._repo is not None:
+            return self
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._proc is not None:
+            self._proc.stdin.close()
+            self._proc.stdout.close()
+            self._proc.wait()
+            self._proc = None
+
+    def get(self, ref: str) -> tuple[str, bytes] | None:
+        """Return (object sha, raw bytes) for ref, or None if it does not exist."""
+        if self._repo is not None:
+            return self._get_in_process(ref)
+        self._proc.stdin.write(ref.encode("utf-8") + b"\n")
+        self._proc.stdin.flush()
+        # Header is "<sha> <type> <size>", or "<ref> missing" / "<ref> ambiguous"
+        header = self._proc.stdout.readline().split()
+        if len(header) != 3:
+            return None
+        sha, _, size = header
+        data = self._proc.stdout.read(int(size) + 1)  # payload + trailing LF
+        return sha.decode("ascii"), data[:-1]
+
+    def _get_in_process(self, ref: str) -> tuple[str, bytes] | None:
+        try:
+            if ref.startswith(":"):
+                oid = self._repo.index[ref[1:]].id
+            else:
+                oid = self._repo.revparse_single(ref).id
+            return str(oid), self._repo[oid].data
+        except (KeyError, ValueError, pygit2.GitError):
+            return None
 
-def index_file(filepath: str, content: str | None = None) -> dict:
+
+def index_file(
+    filepath: str,
+    content: str | bytes | None = None,
+    precomputed_hash: str | None = None,
+) -> dict:
     """Build index entry for a single doc file.
 
-    If content is provided, uses that (for staged mode).
-    Otherwise reads from the working tree.
+    If content is provided, uses that (for staged mode; raw blob bytes are
+    decoded as UTF-8). Otherwise reads from the working tree.
+
+    If precomputed_hash is provided (from batch_hash_objects), it is used
+    as the content hash instead of hashing the content again.
     """
     if content is None:
         content = Path(filepath).read_text(encoding="utf-8")
+    elif isinstance(content, bytes):
+        content = content.decode("utf-8")
 
-    fm = extract_frontmatter(content)
-    title = extract_title(content)
-    links = extract_links(content, filepath)
+    doc = parse_doc(content)
 
-    # Use content_hash_from_bytes when we have raw content (staged mode)
-    chash = content_hash_from_bytes(content)
+    if precomputed_hash:
+        chash = precomputed_hash[:16]
+    else:
+        chash = content_hash_from_bytes(content)
 
     return {
         "path": filepath,
-        "title": title,
-        "authority": fm.get("authority", None),
-        "status": fm.get("status", None),
-        "scope": fm.get("scope", None),
+        "title": doc.title,
+        "authority": doc.frontmatter.get("authority", None),
+        "status": doc.frontmatter.get("status", None),
+        "scope": doc.frontmatter.get("scope", None),
         "content_hash": chash,
-        "links": links,
+        "links": resolve_links(doc.links, filepath),
     }
 
 
-def get_tracked_docs() -> list[str]:
-    """Get all tracked .md files under docs/ from git."""
+def get_tracked_docs() -> dict[str, str]:
+    """Get all tracked .md files under docs/ from git, with their staged blob shas."""
+    repo = open_repo()
+    if repo is not None:
+        return {
+            entry.path: str(entry.id) for entry in repo.index
+            if entry.path.startswith("docs/") and entry.path.endswith(".md")
+        }
     result = subprocess.run(
-        ["git", "ls-files", "docs/"],
+        ["git", "ls-files", "-s", "-z", "docs/"],
         capture_output=True, text=True
     )
     if result.returncode != 0:
-        return []
-    return [f for f in result.stdout.strip().split("\n") if f.endswith(".md") and f]
-
-
-def build_index(staged: bool = False) -> dict:
+        return {}
+    docs = {}
+    for record in result.stdout.split("\0"):
+        # "<mode> <sha> <stage>\t<path>"
+        info, _, path = record.partition("\t")
+        if path.endswith(".md") and info.endswith(" 0"):
+            docs[path] = info.split()[1]
+    return docs
+
+
+def build_index(
+    staged: bool = False,
+    batch: GitCatFileBatch | None = None,
+    previous: dict | None = None,
+) -> dict:
     """Build the full structural index.
 
-    If staged=True, reads content from git index (staged bytes).
+    If staged=True, reads content from git index (staged bytes) through
+    batch, or through a batch opened for this call if none is given.
     Otherwise reads from the working tree.
+
+    If previous (an earlier index of the same INDEX_VERSION) is given, its
+    entries are reused verbatim for docs whose path and content hash are
+    unchanged; only new or modified docs are read and parsed.
     """
+    if staged and batch is None:
+        with GitCatFileBatch() as batch:
+            return build_index(staged=True, batch=batch, previous=previous)
+
     if staged:
-        # Use git ls-files to get the list of tracked docs, then read staged content
-        files = get_tracked_docs()
+        # Use git ls-files to get the tracked docs and their staged blob shas
+        hashes = get_tracked_docs()
+        files = list(hashes)
     else:
-        docs_dir = Path("docs")
-        if not docs_dir.exists():
+        if not Path("docs").exists():
             return {"version": INDEX_VERSION, "entries": []}
-        files = [str(p) for p in sorted(docs_dir.rglob("*.md"))]
+        files = [
+            f
+            for f in walk_files("docs", lambda path, _: (path + "/").startswith(SKIP_PREFIXES))
+            if f.endswith(".md")
+        ]
+
+    files = [f for f in sorted(files) if not f.startswith(SKIP_PREFIXES)]
+
+    if not staged:
+        hashes = batch_hash_objects(files)
+
+    reusable = {}
+    if previous and previous.get("version") == INDEX_VERSION:
+        reusable = {(e["path"], e["content_hash"]): e for e in previous.get("entries", [])}
 
     entries = []
-    for filepath in sorted(files):
-        if any(filepath.startswith(p) for p in SKIP_PREFIXES):
-            continue
-        try:
-            if staged:
-                content = read_staged_content(filepath)
-                if content is None:
+    with ThreadPoolExecutor(max_workers=INDEX_WORKERS) as pool:
+        pending = []
+        for filepath in files:
+            sha = hashes.get(filepath)
+            cached = reusable.get((filepath, sha[:16])) if sha else None
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+            elif staged:
+                # Single producer: blobs come off the one cat-file pipe in order
+                blob = batch.get(f":{filepath}")
+                if blob is None:
                     continue
-                entry = index_file(filepath, content=content)
+                sha, raw = blob
+                future = pool.submit(index_file, filepath, content=raw, precomputed_hash=sha)
             else:
-                entry = index_file(filepath)
-            entries.append(entry)
-        except (OSError, UnicodeDecodeError) as e:
-            print(f"warning: skipping {filepath}: {e}", file=sys.stderr)
+                future = pool.submit(index_file, filepath, precomputed_hash=sha)
+            pending.append((filepath, future))
+
+        # Collect in submission (sorted path) order so output stays deterministic
+        for filepath, future in pending:
+            try:
+                entries.append(future.result())
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"warning: skipping {filepath}: {e}", file=sys.stderr)
 
     aggregate = hashlib.sha256(
         json.dumps(entries, sort_keys=True).encode()
@@ -207,13 +455,22 @@ def build_index(staged: bool = False) -> dict:
     }
 
 
+def dump_json(obj) -> bytes:
+    """Serialize obj as 2-space indented UTF-8 JSON with a trailing newline.
+
+    Byte-identical to json.dumps(obj, indent=2, ensure_ascii=False) + "\n"
+    for the str-keyed, int/str/list/dict payloads written here; insertion
+    order is kept, so no sort option.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
 def write_index(index: dict) -> None:
     """Write index to disk."""
     INDEX_DIR.mkdir(parents=True, exist_ok=True)
-    INDEX_FILE.write_text(
-        json.dumps(index, indent=2, ensure_ascii=False) + "\n",
-        encoding="utf-8",
-    )
+    INDEX_FILE.write_bytes(dump_json(index))
 
 
 def read_existing_index() -> dict | None:
@@ -226,16 +483,13 @@ def read_existing_index() -> dict | None:
         return None
 
 
-def read_staged_index() -> dict | None:
+def read_staged_index(batch: GitCatFileBatch) -> dict | None:
     """Read existing index from the git index (staged version)."""
-    result = subprocess.run(
-        ["git", "show", f":{INDEX_FILE}"],
-        capture_output=True, text=True
-    )
-    if result.returncode != 0:
+    blob = batch.get(f":{INDEX_FILE}")
+    if blob is None:
         return None
     try:
-        return json.loads(result.stdout)
+        return json.loads(blob[1])
     except json.JSONDecodeError:
         return None
 
@@ -247,15 +501,17 @@ def check_staleness(staged: bool = False) -> bool:
     Otherwise compares the on-disk index against working tree doc content.
     """
     if staged:
-        existing = read_staged_index()
+        with GitCatFileBatch() as batch:
+            existing = read_staged_index(batch)
+            fresh = build_index(staged=True, batch=batch, previous=existing)
     else:
         existing = read_existing_index()
+        fresh = build_index(previous=existing)
 
     if existing is None:
         print("docs index does not exist — run: python tools/docs_index.py --mode structural", file=sys.stderr)
         return True
 
-    fresh = build_index(staged=staged)
     if existing.get("aggregate_hash") != fresh.get("aggregate_hash"):
         print(
             "docs index is stale — run: python tools/docs_index.py --mode structural",
@@ -295,7 +551,7 @@ def main():
         sys.exit(1)
 
     # Structural mode: build and write (always from working tree)
-    index = build_index(staged=False)
+    index = build_index(staged=False, previous=read_existing_index())
     write_index(index)
     print(f"Indexed {index['entry_count']} docs -> {INDEX_FILE}")
 
@@ -23,16 +23,21 @@ Author: @darianrosebrook
 
 import argparse
 import ast
-import hashlib
+import inspect
+import io
 import json
 import os
 import re
 import subprocess
 import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from docs_index import dump_json, fallback_hash, parse_doc, walk_files
+
 # --- Constants ---
 
 INVENTORY_VERSION = "1.0.0"
@@ -45,10 +50,12 @@ CACHE_DIR = Path(".cache/inventory")
 CACHE_FILE = CACHE_DIR / "descriptions.json"
 
 # Regexes
-FRONTMATTER_RE = re.compile(r"\A---\s*\n(.*?)\n---", re.DOTALL)
-FIELD_RE = re.compile(r"^(\w[\w-]*):\s*(.+)$", re.MULTILINE)
-TITLE_RE = re.compile(r"^#\s+(.+)$", re.MULTILINE)
-SHELL_HEADER_RE = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+# Module docstring fast path: comment/blank lines, then a triple quote at
+# column 0; after the closing quote only a comment may follow on that line.
+PY_DOCSTRING_OPEN_RE = re.compile(r"""(?:[ \t]*(?:#[^\n]*)?\n)*(?:"{3}|'{3})""")
+PY_STMT_END_RE = re.compile(r"[ \t]*(?:#[^\n]*)?(?:\n|\Z)")
+# Leading run of comment / blank lines (whitespace other than newline allowed)
+SHELL_BLOCK_RE = re.compile(r"\A(?:[^\S\n]*(?:#[^\n]*)?(?:\n|\Z))*")
 YAML_TITLE_RE = re.compile(r"^title:\s*[\"']?(.+?)[\"']?\s*$", re.MULTILINE)
 
 # Sterling Native project context for LLM prompts
@@ -88,44 +95,66 @@ SCAN_TARGETS: List[Tuple[str, List[str], str, str]] = [
 SKIP_DIRS = {".git", "node_modules", "tmp", ".claude", "__pycache__", "docs/_index", "docs/MOC"}
 SKIP_FILENAMES = {".DS_Store"}
 
+# Per-file reads and metadata extraction run on a thread pool
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Characters of file content shown to the LLM in augmented mode
+PREVIEW_CHARS = 2500
+
 
 # --- Metadata extraction ---
 
-def git_blob_sha(filepath: str) -> str:
-    """Get the git blob sha for a file (working tree version)."""
+def batch_hash_objects(paths: List[str]) -> Dict[str, str]:
+    """Get git blob shas for many files (working tree) in one subprocess.
+
+    Feeds all paths to a single `git hash-object --stdin-paths` instead of
+    forking once per file. Returns {path: blob_sha}; paths are absent from
+    the result if git is unavailable or rejects the batch.
+    """
+    if not paths:
+        return {}
     try:
-        result = subprocess.run(
-            ["git", "hash-object", filepath],
-            capture_output=True, text=True
+        proc = subprocess.Popen(
+            ["git", "hash-object", "--stdin-paths"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True,
         )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except Exception:
-        pass
-    # Fallback: content hash
+        stdout, _ = proc.communicate("\n".join(paths) + "\n")
+    except OSError:
+        return {}
+    shas = stdout.split()
+    if proc.returncode != 0 or len(shas) != len(paths):
+        return {}
+    return dict(zip(paths, shas))
+
+
+def fallback_blob_sha(filepath: str) -> str:
+    """Content hash for files missing from the batch_hash_objects result."""
     try:
-        content = Path(filepath).read_bytes()
-        return hashlib.sha256(content).hexdigest()[:16]
+        return fallback_hash(Path(filepath).read_bytes())
     except Exception:
         return "unknown"
 
 
-def extract_frontmatter(content: str) -> Dict[str, str]:
-    """Extract YAML front-matter fields as a flat dict."""
-    match = FRONTMATTER_RE.search(content)
-    if not match:
-        return {}
-    fields = {}
-    for m in FIELD_RE.finditer(match.group(1)):
-        fields[m.group(1).lower()] = m.group(2).strip().strip('"').strip("'")
-    return fields
-
+def scan_module_docstring(content: str) -> Optional[str]:
+    """Read a plain triple-quoted module docstring without parsing the file.
 
-def extract_md_title(content: str) -> str:
-    """Extract first H1 heading from markdown, skipping front-matter."""
-    stripped = FRONTMATTER_RE.sub("", content).strip()
-    match = TITLE_RE.search(stripped)
-    return match.group(1).strip() if match else ""
+    Returns the raw literal text, or None when the source is not in the
+    simple shape (string prefix, escapes, CR line endings, code after the
+    literal, ...) so the caller can fall back to ast.
+    """
+    match = PY_DOCSTRING_OPEN_RE.match(content)
+    if not match:
+        return None
+    start = match.end()
+    quote = content[start - 3:start]
+    end = content.find(quote, start)
+    if end == -1 or not PY_STMT_END_RE.match(content, end + 3):
+        return None
+    raw = content[start:end]
+    if "\\" in raw or "\r" in content[:end]:
+        return None
+    return raw
 
 
 def extract_python_meta(content: str) -> Tuple[str, str]:
@@ -133,11 +162,15 @@ def extract_python_meta(content: str) -> Tuple[str, str]:
 
     Returns (title, summary).
     """
-    try:
-        tree = ast.parse(content)
-        docstring = ast.get_docstring(tree) or ""
-    except SyntaxError:
-        docstring = ""
+    raw = scan_module_docstring(content)
+    if raw is not None:
+        docstring = inspect.cleandoc(raw)
+    else:
+        try:
+            tree = ast.parse(content)
+            docstring = ast.get_docstring(tree) or ""
+        except SyntaxError:
+            docstring = ""
 
     if docstring:
         lines = docstring.strip().split("\n")
@@ -154,18 +187,14 @@ def extract_shell_meta(content: str) -> Tuple[str, str]:
 
     Returns (title, summary).
     """
-    lines = content.split("\n")
-    comment_lines = []
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith("#!"):
-            continue
-        if stripped.startswith("#"):
-            comment_lines.append(stripped.lstrip("# ").strip())
-        elif stripped == "":
-            continue
-        else:
-            break
+    # Only the header block is split, not the whole script; shebangs and
+    # blank lines inside it are dropped, "#" lines kept (even if empty)
+    header = SHELL_BLOCK_RE.match(content).group(0)
+    comment_lines = [
+        stripped.lstrip("# ").strip()
+        for stripped in map(str.strip, header.split("\n"))
+        if stripped.startswith("#") and not stripped.startswith("#!")
+    ]
 
     if comment_lines:
         title = comment_lines[0]
@@ -183,12 +212,12 @@ def extract_yaml_meta(content: str) -> Tuple[str, str]:
     return title, ""
 
 
-def file_metadata(filepath: str) -> Dict:
-    """Get basic file metadata."""
-    stat = Path(filepath).stat()
-    content = Path(filepath).read_text(encoding="utf-8", errors="replace")
+def file_metadata(content: str, stat: os.stat_result) -> Dict:
+    """Get basic file metadata from already-read content and its stat."""
+    # Matches len(content.splitlines()) for LF text, without building the list
+    lines = content.count("\n") + (bool(content) and not content.endswith("\n"))
     return {
-        "lines": len(content.splitlines()),
+        "lines": lines,
         "size_bytes": stat.st_size,
         "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
     }
@@ -203,16 +232,12 @@ def scan_files() -> List[Tuple[str, str, str]]:
     """
     results = []
     for root_dir, extensions, content_type, category in SCAN_TARGETS:
-        root_path = Path(root_dir)
-        if not root_path.exists():
+        if any(part in SKIP_DIRS for part in Path(root_dir).parts):
             continue
-        for path in sorted(root_path.rglob("*")):
-            if not path.is_file():
-                continue
-            if path.name in SKIP_FILENAMES:
-                continue
-            # Check skip dirs
-            if any(part in SKIP_DIRS for part in path.parts):
+        # Skipped directories are pruned without being opened
+        for filepath in walk_files(root_dir, lambda _, name: name in SKIP_DIRS):
+            path = Path(filepath)
+            if path.name in SKIP_FILENAMES or path.name in SKIP_DIRS:
                 continue
             # Check extension
             if extensions:
@@ -221,28 +246,49 @@ def scan_files() -> List[Tuple[str, str, str]]:
                 # For extensionless files (git hooks), check they have no suffix
                 if "" in extensions and path.suffix and path.suffix not in extensions:
                     continue
-            results.append((str(path), content_type, category))
+            results.append((filepath, content_type, category))
     return results
 
 
+def text_preview(content: str) -> str:
+    """First PREVIEW_CHARS of content, with newlines translated as read_text() does."""
+    # Translation only shrinks text, so twice the budget always suffices
+    head = content[:2 * PREVIEW_CHARS]
+    if "\r" in head:
+        head = head.replace("\r\n", "\n").replace("\r", "\n")
+    return head[:PREVIEW_CHARS]
+
+
 def build_entry(
     filepath: str,
     content_type: str,
     category: str,
     include_v1: bool = False,
+    blob_sha: Optional[str] = None,
+    keep_preview: bool = False,
 ) -> Optional[Dict]:
-    """Build a single inventory entry."""
+    """Build a single inventory entry.
+
+    blob_sha should come from batch_hash_objects; if omitted, a fallback
+    content hash is used instead. With keep_preview, the entry also carries
+    a private "_preview" of the content for augment_inventory, which pops it
+    so it never reaches the written inventory.
+    """
     # Skip v1 reference unless requested
     if not include_v1 and filepath.startswith("docs/reference/v1/"):
         return None
 
+    # One stat and one read per file; metadata and extraction share the content
+    path = Path(filepath)
     try:
-        content = Path(filepath).read_text(encoding="utf-8", errors="replace")
+        stat = path.stat()
+        content = path.read_bytes().decode("utf-8", errors="replace")
     except OSError:
         return None
 
-    meta = file_metadata(filepath)
-    blob_sha = git_blob_sha(filepath)
+    meta = file_metadata(content, stat)
+    if blob_sha is None:
+        blob_sha = fallback_blob_sha(filepath)
 
     # Extract metadata based on content type
     authority = None
@@ -250,11 +296,11 @@ def build_entry(
     summary = ""
 
     if content_type == "documentation":
-        fm = extract_frontmatter(content)
-        authority = fm.get("authority")
-        title = extract_md_title(content)
+        doc = parse_doc(content, with_links=False)
+        authority = doc.frontmatter.get("authority")
+        title = doc.title
         # Use front-matter scope or status as summary hint
-        summary = fm.get("scope", fm.get("status", ""))
+        summary = doc.frontmatter.get("scope", doc.frontmatter.get("status", ""))
     elif content_type == "code" and filepath.endswith(".py"):
         title, summary = extract_python_meta(content)
     elif content_type == "script":
@@ -269,7 +315,7 @@ def build_entry(
     if not title:
         title = Path(filepath).name
 
-    return {
+    entry = {
         "path": filepath,
         "content_type": content_type,
         "category": category,
@@ -279,16 +325,30 @@ def build_entry(
         "blob_sha": blob_sha,
         "metadata": meta,
     }
+    if keep_preview:
+        entry["_preview"] = text_preview(content)
+    return entry
 
 
-def build_structural_inventory(include_v1: bool = False) -> Dict:
-    """Build the full structural inventory (no LLM)."""
+def build_structural_inventory(include_v1: bool = False, keep_previews: bool = False) -> Dict:
+    """Build the full structural inventory (no LLM).
+
+    keep_previews retains each file's preview on its entry (see build_entry)
+    so augment_inventory does not have to read every file a second time.
+    """
     files = scan_files()
-    entries = []
-    for filepath, content_type, category in files:
-        entry = build_entry(filepath, content_type, category, include_v1=include_v1)
-        if entry:
-            entries.append(entry)
+    blob_shas = batch_hash_objects([filepath for filepath, _, _ in files])
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        futures = [
+            pool.submit(
+                build_entry, filepath, content_type, category,
+                include_v1=include_v1, blob_sha=blob_shas.get(filepath),
+                keep_preview=keep_previews,
+            )
+            for filepath, content_type, category in files
+        ]
+        # Results in scan order, so output stays deterministic
+        entries = [entry for entry in (f.result() for f in futures) if entry]
 
     return {
         "version": INVENTORY_VERSION,
@@ -314,10 +374,7 @@ def load_cache() -> Dict:
 def save_cache(cache: Dict) -> None:
     """Save the description cache."""
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    CACHE_FILE.write_text(
-        json.dumps(cache, indent=2, ensure_ascii=False) + "\n",
-        encoding="utf-8",
-    )
+    CACHE_FILE.write_bytes(dump_json(cache))
 
 
 def cache_key(blob_sha: str, model_id: str) -> str:
@@ -332,14 +389,41 @@ def augment_inventory(inventory: Dict, model: str = "olmo-3:latest") -> Dict:
     """
     # Lazy import to avoid requiring LLM deps for structural mode
     sys.path.insert(0, str(Path(__file__).parent))
-    from llm_client import build_moc_description_prompt, generate_description
+    from llm_client import build_moc_description_prompt, generate_descriptions
 
     cache = load_cache()
     updated = 0
     cached = 0
     failed = 0
+    # Entries awaiting the LLM, sent MOC_LLM_BATCH at a time (default 1)
+    batch_env = os.getenv("MOC_LLM_BATCH", "1").strip()
+    try:
+        batch_size = max(1, int(batch_env))
+    except ValueError:
+        print(f"  Ignoring unknown MOC_LLM_BATCH={batch_env!r} (expected a positive integer)")
+        batch_size = 1
+    pending: List[Tuple[Dict, str, Tuple[str, str, str]]] = []
+
+    def flush() -> None:
+        nonlocal updated, failed
+        results = generate_descriptions(
+            [request for _, _, request in pending],
+            model=model,
+            max_chars=500,
+        )
+        for (entry, key, _), result in zip(pending, results):
+            if result:
+                entry["description"] = result
+                cache[key] = result
+                updated += 1
+                print(f"  + {entry['path']}")
+            else:
+                failed += 1
+                print(f"  - {entry['path']} (no LLM response, keeping fallback)")
+        pending.clear()
 
     for entry in inventory["entries"]:
+        kept_preview = entry.pop("_preview", None)
         key = cache_key(entry["blob_sha"], model)
 
         # Check cache first
@@ -350,12 +434,14 @@ def augment_inventory(inventory: Dict, model: str = "olmo-3:latest") -> Dict:
 
         # Build prompt
         content_type = entry["content_type"]
-        preview = ""
-        try:
-            raw = Path(entry["path"]).read_text(encoding="utf-8", errors="replace")
-            preview = raw[:2500]
-        except OSError:
-            pass
+        preview = kept_preview
+        if preview is None:
+            preview = ""
+            try:
+                raw = Path(entry["path"]).read_text(encoding="utf-8", errors="replace")
+                preview = raw[:PREVIEW_CHARS]
+            except OSError:
+                pass
 
         prompt, system_prompt = build_moc_description_prompt(
             content_type,
@@ -368,21 +454,12 @@ def augment_inventory(inventory: Dict, model: str = "olmo-3:latest") -> Dict:
             max_chars=500,
         )
 
-        result = generate_description(
-            prompt, system_prompt,
-            content_type=content_type,
-            model=model,
-            max_chars=500,
-        )
+        pending.append((entry, key, (prompt, system_prompt, content_type)))
+        if len(pending) >= batch_size:
+            flush()
 
-        if result:
-            entry["description"] = result
-            cache[key] = result
-            updated += 1
-            print(f"  + {entry['path']}")
-        else:
-            failed += 1
-            print(f"  - {entry['path']} (no LLM response, keeping fallback)")
+    if pending:
+        flush()
 
     save_cache(cache)
     print(f"\nAugmented: {updated} new, {cached} cached, {failed} failed")
@@ -394,10 +471,7 @@ def augment_inventory(inventory: Dict, model: str = "olmo-3:latest") -> Dict:
 def write_json(inventory: Dict) -> None:
     """Write JSON inventory."""
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    OUTPUT_JSON.write_text(
-        json.dumps(inventory, indent=2, ensure_ascii=False) + "\n",
-        encoding="utf-8",
-    )
+    OUTPUT_JSON.write_bytes(dump_json(inventory))
 
 
 def write_markdown(inventory: Dict) -> None:
@@ -405,57 +479,54 @@ def write_markdown(inventory: Dict) -> None:
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
 
-    # Group entries by category
-    by_category: Dict[str, List[Dict]] = {}
+    # Group entries by category, sorting each group once
+    by_category: Dict[str, List[Dict]] = defaultdict(list)
     for entry in inventory["entries"]:
-        cat = entry.get("category", "Other")
-        by_category.setdefault(cat, []).append(entry)
-
-    lines = [
-        "# Sterling Native Project Inventory",
-        "",
-        f"**Generated**: {now}",
-        f"**Entries**: {inventory['entry_count']}",
-        f"**Version**: {inventory['version']}",
-        "",
-    ]
+        by_category[entry.get("category", "Other")].append(entry)
+    categories = sorted(by_category)
+    for cat in categories:
+        by_category[cat].sort(key=lambda e: e["path"])
+
+    buf = io.StringIO()
+    w = buf.write
+    w("# Sterling Native Project Inventory\n\n")
+    w(f"**Generated**: {now}\n")
+    w(f"**Entries**: {inventory['entry_count']}\n")
+    w(f"**Version**: {inventory['version']}\n\n")
 
     # Summary table
-    lines.append("## Summary")
-    lines.append("")
-    lines.append("| Category | Count |")
-    lines.append("|----------|-------|")
-    for cat in sorted(by_category.keys()):
-        lines.append(f"| {cat} | {len(by_category[cat])} |")
-    lines.append("")
+    w("## Summary\n\n")
+    w("| Category | Count |\n")
+    w("|----------|-------|\n")
+    for cat in categories:
+        w(f"| {cat} | {len(by_category[cat])} |\n")
+    w("\n")
 
     # Category sections
-    for cat in sorted(by_category.keys()):
+    for cat in categories:
         entries = by_category[cat]
-        lines.append(f"## {cat}")
-        lines.append("")
-        lines.append("| Path | Title | Lines | Authority |")
-        lines.append("|------|-------|-------|-----------|")
-        for entry in sorted(entries, key=lambda e: e["path"]):
+        w(f"## {cat}\n\n")
+        w("| Path | Title | Lines | Authority |\n")
+        w("|------|-------|-------|-----------|\n")
+        for entry in entries:
             path = entry["path"]
             title = entry.get("title", "")[:60]
             line_count = entry.get("metadata", {}).get("lines", "")
             authority = entry.get("authority", "")
-            lines.append(f"| `{path}` | {title} | {line_count} | {authority} |")
-        lines.append("")
+            w(f"| `{path}` | {title} | {line_count} | {authority} |\n")
+        w("\n")
 
         # Descriptions (if augmented)
         has_descriptions = any(e.get("description") for e in entries)
         if has_descriptions:
-            lines.append("### Descriptions")
-            lines.append("")
-            for entry in sorted(entries, key=lambda e: e["path"]):
+            w("### Descriptions\n\n")
+            for entry in entries:
                 desc = entry.get("description", "")
                 if desc:
-                    lines.append(f"- **`{entry['path']}`**: {desc}")
-            lines.append("")
+                    w(f"- **`{entry['path']}`**: {desc}\n")
+            w("\n")
 
-    OUTPUT_MD.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    OUTPUT_MD.write_text(buf.getvalue(), encoding="utf-8")
 
 
 # --- CLI ---
@@ -479,7 +550,10 @@ def main():
     args = parser.parse_args()
 
     print(f"Scanning project files...")
-    inventory = build_structural_inventory(include_v1=args.include_v1_reference)
+    inventory = build_structural_inventory(
+        include_v1=args.include_v1_reference,
+        keep_previews=args.mode == "augmented",
+    )
     print(f"Found {inventory['entry_count']} entries")
 
     if args.mode == "augmented":
@@ -20,16 +20,45 @@ Exit codes:
     1 = one or more checks failed
 """
 
+import bisect
+import functools
+import itertools
+import mmap
+import os
 import re
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
+try:
+    import ahocorasick  # optional: pyahocorasick multi-pattern matching
+except ImportError:
+    ahocorasick = None
+
 SPEC_DIR = Path(".caws/specs")
 
 # Directories to search for anchors (relative to repo root).
 SEARCH_PATHS = ["kernel/", "search/", "harness/", "tests/", ".github/"]
 
+# File types scanned for anchors (a tuple, for one str.endswith call).
+ANCHOR_SUFFIXES = (".rs", ".yml", ".yaml", ".toml", ".md")
+
+# Anchor scans below this many bytes stay serial: process start-up would
+# cost more than the scan itself.
+PARALLEL_SCAN_MIN_BYTES = 32 * 1024 * 1024
+
+# Specs are linted concurrently (their file reads overlap), up to this many.
+SPEC_WORKERS = 8
+
+# Files at least this large are scanned through a read-only mmap instead of
+# being copied into a bytes object first.
+MMAP_MIN_BYTES = 64 * 1024
+
+# The Aho-Corasick scan decodes files in windows of this many bytes.
+SCAN_CHUNK_BYTES = 1024 * 1024
+
 # Directories to search when resolving bare filenames in pointers.tests.
 RESOLVE_ROOTS = [
     Path("kernel/src"),
@@ -43,8 +72,18 @@ RESOLVE_ROOTS = [
 # S1-M* for SPINE-001, SC1-M* for SEARCH-CORE-001, and a general fallback.
 ACCEPTANCE_ID_RE = re.compile(r"\b(?:S1|SC1)-M\d+(?:-[A-Z0-9]+)+\b")
 
-# Pointer pattern: "filename.rs::fn_name" in YAML.
-POINTER_RE = re.compile(r'"([^"]+\.rs)::([^"]+)"')
+# Acceptance IDs and "filename.rs::fn_name" pointers in one sweep over a
+# whole spec. Pointer parts exclude every str.splitlines() break, so a
+# pointer never spans a line.
+_NOT_QUOTE_OR_BREAK = r'[^"\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]'
+SPEC_SCAN_RE = re.compile(
+    rf"(?P<aid>{ACCEPTANCE_ID_RE.pattern})"
+    rf'|"(?P<file>{_NOT_QUOTE_OR_BREAK}+\.rs)::(?P<fn>{_NOT_QUOTE_OR_BREAK}+)"'
+)
+
+# Function declarations: `fn name(` with optional whitespace variations.
+FN_DECL_RE = re.compile(r"\bfn\s+(\w+)\s*\(")
+IDENT_RE = re.compile(r"\w+")
 
 
 def find_spec_files() -> list[Path]:
@@ -55,10 +94,31 @@ def find_spec_files() -> list[Path]:
     return specs
 
 
+@functools.lru_cache(maxsize=None)
+def _scan_spec(spec_path: Path) -> tuple[frozenset[str], tuple[tuple[str, str, int], ...]]:
+    """Read and scan a spec once per run: (acceptance_ids, test_pointers).
+
+    One SPEC_SCAN_RE pass finds both; line numbers come from a bisect over
+    line start offsets (same line breaks as str.splitlines()).
+    """
+    text = spec_path.read_text()
+    line_starts = [0, *itertools.accumulate(len(line) for line in text.splitlines(True))]
+    ids: set[str] = set()
+    pointers = []
+    for match in SPEC_SCAN_RE.finditer(text):
+        if match.group("aid") is not None:
+            ids.add(match.group("aid"))
+            continue
+        line_no = bisect.bisect_right(line_starts, match.start())
+        pointers.append((match.group("file"), match.group("fn"), line_no))
+        # An ID quoted inside a pointer would otherwise be consumed by it
+        ids.update(ACCEPTANCE_ID_RE.findall(match.group(0)))
+    return frozenset(ids), tuple(pointers)
+
+
 def extract_acceptance_ids(spec_path: Path) -> set[str]:
     """Extract all acceptance IDs from the spec file."""
-    text = spec_path.read_text()
-    return set(ACCEPTANCE_ID_RE.findall(text))
+    return set(_scan_spec(spec_path)[0])
 
 
 def extract_test_pointers(spec_path: Path) -> list[tuple[str, str, int]]:
@@ -66,36 +126,135 @@ def extract_test_pointers(spec_path: Path) -> list[tuple[str, str, int]]:
 
     Returns list of (filename, fn_name, line_number).
     """
-    pointers = []
-    for i, line in enumerate(spec_path.read_text().splitlines(), start=1):
-        for match in POINTER_RE.finditer(line):
-            pointers.append((match.group(1), match.group(2), i))
-    return pointers
+    return list(_scan_spec(spec_path)[1])
+
 
+def list_anchor_files(search_paths: list[str]) -> list[Path]:
+    """List tracked files under search_paths that may carry acceptance IDs.
 
-def grep_for_id(acceptance_id: str, search_paths: list[str]) -> list[str]:
-    """Search for a literal acceptance ID string in the workspace."""
+    One `git ls-files` call; falls back to walking the working tree when git
+    is unavailable (os.walk already separates files from directories, so no
+    per-entry stat is needed to filter them).
+    """
     try:
         result = subprocess.run(
-            [
-                "grep",
-                "-rn",
-                "--include=*.rs",
-                "--include=*.yml",
-                "--include=*.yaml",
-                "--include=*.toml",
-                "--include=*.md",
-                "-l",
-                acceptance_id,
-                *search_paths,
-            ],
+            ["git", "ls-files", "-z", "--", *search_paths],
             capture_output=True,
-            text=True,
+            check=True,
             timeout=30,
         )
-        return [f for f in result.stdout.strip().split("\n") if f]
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        return []
+        paths = result.stdout.decode().split("\0")
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
+        paths = [
+            os.path.join(dirpath, name)
+            for root in search_paths
+            for dirpath, _, names in os.walk(root)
+            for name in names
+        ]
+    return [Path(p) for p in paths if has_anchor_suffix(p)]
+
+
+def has_anchor_suffix(path: str) -> bool:
+    """Same test as Path(path).suffix in ANCHOR_SUFFIXES, on the raw string.
+
+    A bare dotfile such as ".md" has no suffix, hence the basename check.
+    """
+    return path.endswith(ANCHOR_SUFFIXES) and os.path.basename(path) not in ANCHOR_SUFFIXES
+
+
+def build_id_matcher(ids: set[str]):
+    """Build a scan(buf) -> set[str] matching every ID in a single pass.
+
+    buf is any bytes-like object (bytes or a read-only mmap).
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for aid in ids:
+            automaton.add_word(aid, aid)
+        automaton.make_automaton()
+
+        # Consecutive windows overlap by this much, so an ID straddling a
+        # window boundary is still whole in the earlier window.
+        overlap = max(map(len, ids)) - 1
+
+        def scan(buf) -> set[str]:
+            # IDs are ASCII, so latin-1 maps bytes 1:1 without decode errors.
+            # Windows are decoded from a memoryview, so a large mmap is
+            # never copied into one str.
+            found: set[str] = set()
+            with memoryview(buf) as view:
+                for start in range(0, len(view), SCAN_CHUNK_BYTES):
+                    window = str(view[start:start + SCAN_CHUNK_BYTES + overlap], "latin-1")
+                    found.update(aid for _, aid in automaton.iter(window))
+            return found
+
+        return scan
+
+    # Fallback: one alternation tried at every offset (zero-width lookahead),
+    # longest ID first. A hit also anchors any ID that is a substring of it,
+    # which covers IDs that are prefixes of a longer one at the same offset.
+    ordered = sorted(ids, key=len, reverse=True)
+    pattern = re.compile(
+        b"(?=(" + b"|".join(re.escape(aid.encode()) for aid in ordered) + b"))"
+    )
+    implied = {aid: {other for other in ids if other in aid} for aid in ids}
+
+    def scan(buf) -> set[str]:
+        found: set[str] = set()
+        for hit in set(pattern.findall(buf)):
+            found |= implied[hit.decode()]
+        return found
+
+    return scan
+
+
+def scan_files_for_ids(ids: set[str], files: list[Path]) -> set[str]:
+    """Serially scan files, returning the IDs found (stops once all are)."""
+    anchored: set[str] = set()
+    scan = build_id_matcher(ids)
+    for path in files:
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size >= MMAP_MIN_BYTES:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                        anchored |= scan(buf)
+                else:
+                    anchored |= scan(f.read())
+        except (OSError, ValueError):  # ValueError: mmap of a file truncated to empty
+            continue
+        if len(anchored) == len(ids):
+            break
+    return anchored
+
+
+def total_size(files: list[Path]) -> int:
+    size = 0
+    for path in files:
+        try:
+            size += path.stat().st_size
+        except OSError:
+            pass
+    return size
+
+
+def find_anchored_ids(ids: set[str], files: list[Path]) -> set[str]:
+    """Return the IDs that appear as a literal string in any of files.
+
+    Large workspaces are split into one shard per CPU and scanned in worker
+    processes (the matcher is rebuilt per worker from the ID set).
+    """
+    if not ids:
+        return set()
+    workers = os.cpu_count() or 1
+    if workers == 1 or total_size(files) < PARALLEL_SCAN_MIN_BYTES:
+        return scan_files_for_ids(ids, files)
+
+    shards = [files[i::workers] for i in range(workers)]
+    anchored: set[str] = set()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for found in pool.map(scan_files_for_ids, repeat(ids), shards):
+            anchored |= found
+    return anchored
 
 
 class AmbiguousFile(Exception):
@@ -106,6 +265,49 @@ class AmbiguousFile(Exception):
         self.candidates = candidates
 
 
+def _walk_rs_files(root: str):
+    """Yield .rs file paths under root: a directory's files, then its subdirs.
+
+    That is rglob's order. Types come from the DirEntry (readdir d_type), so
+    regular files and directories cost no stat; symlinks are not descended.
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+        elif entry.name.endswith(".rs") and entry.is_file():
+            yield entry.path
+    for subdir in subdirs:
+        yield from _walk_rs_files(subdir)
+
+
+@functools.cache
+def _basename_index() -> dict[str, Path | list[Path]]:
+    """Map each .rs basename under RESOLVE_ROOTS to its paths (one walk per run).
+
+    A unique basename maps to its Path; only a repeated one is upgraded to
+    a list. Paths appear in root order, then walk order, as the per-pointer
+    rglob scans returned them.
+    """
+    index: dict[str, Path | list[Path]] = {}
+    for root in RESOLVE_ROOTS:
+        for path in _walk_rs_files(str(root)):
+            name = os.path.basename(path)
+            seen = index.get(name)
+            if seen is None:
+                index[name] = Path(path)
+            elif isinstance(seen, Path):
+                index[name] = [seen, Path(path)]
+            else:
+                seen.append(Path(path))
+    return index
+
+
 def resolve_file(filename: str) -> Path | None:
     """Resolve a bare or prefixed filename to a workspace path.
 
@@ -121,29 +323,44 @@ def resolve_file(filename: str) -> Path | None:
         return direct
 
     # Search under known roots — collect all matches.
-    basename = Path(filename).name
-    hits: list[Path] = []
-    for root in RESOLVE_ROOTS:
-        for candidate in root.rglob(basename):
-            if candidate.is_file():
-                hits.append(candidate)
+    hits = _basename_index().get(direct.name)
 
-    if len(hits) == 1:
-        return hits[0]
-    if len(hits) > 1:
-        raise AmbiguousFile(filename, hits)
-    return None
+    if hits is None or isinstance(hits, Path):
+        return hits
+    raise AmbiguousFile(filename, hits)
 
 
-def file_contains_fn(path: Path, fn_name: str) -> bool:
-    """Check whether a file contains `fn fn_name(`."""
+@functools.lru_cache(maxsize=None)
+def _read_source(path: Path) -> str | None:
+    """Read a source file once per run (many pointers share a test file)."""
     try:
-        text = path.read_text()
-        # Match `fn fn_name(` with optional whitespace variations.
-        pattern = re.compile(rf"\bfn\s+{re.escape(fn_name)}\s*\(")
-        return bool(pattern.search(text))
+        return path.read_text()
     except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _fns_in(path: Path) -> frozenset[str]:
+    """Names of every `fn name(` declared in the file."""
+    text = _read_source(path)
+    return frozenset(FN_DECL_RE.findall(text)) if text is not None else frozenset()
+
+
+@functools.lru_cache(maxsize=None)
+def _fn_decl_re(fn_name: str) -> re.Pattern:
+    """FN_DECL_RE with the name fixed, compiled once per distinct name."""
+    return re.compile(rf"\bfn\s+{re.escape(fn_name)}\s*\(")
+
+
+def file_contains_fn(path: Path, fn_name: str) -> bool:
+    """Check whether a file contains `fn fn_name(`."""
+    if IDENT_RE.fullmatch(fn_name):
+        return fn_name in _fns_in(path)
+    # Not a plain identifier (e.g. a raw r#name): match the declaration itself.
+    text = _read_source(path)
+    if text is None:
         return False
+    return _fn_decl_re(fn_name).search(text) is not None
 
 
 # ---------------------------------------------------------------------------
@@ -151,14 +368,19 @@ def file_contains_fn(path: Path, fn_name: str) -> bool:
 # ---------------------------------------------------------------------------
 
 
-def lint_acceptance_ids_for_spec(spec_path: Path) -> tuple[set[str], list[str]]:
-    """Returns (all_ids, unanchored_ids) for a single spec."""
+def lint_acceptance_ids_for_spec(
+    spec_path: Path,
+    anchored: set[str] | None = None,
+) -> tuple[set[str], list[str]]:
+    """Returns (all_ids, unanchored_ids) for a single spec.
+
+    `anchored` is a precomputed set of IDs found in the workspace (see
+    main()); without it the workspace is scanned for this spec's IDs alone.
+    """
     ids = extract_acceptance_ids(spec_path)
-    unanchored = []
-    for aid in sorted(ids):
-        hits = grep_for_id(aid, SEARCH_PATHS)
-        if not hits:
-            unanchored.append(aid)
+    if anchored is None:
+        anchored = find_anchored_ids(ids, list_anchor_files(SEARCH_PATHS))
+    unanchored = [aid for aid in sorted(ids) if aid not in anchored]
     return ids, unanchored
 
 
@@ -195,6 +417,16 @@ def lint_test_pointers_for_spec(
     return pointers, broken
 
 
+def lint_spec(
+    spec_path: Path,
+    anchored: set[str],
+) -> tuple[set[str], list[str], list[tuple[str, str, int]], list[str]]:
+    """Run both lints for one spec: (ids, unanchored, pointers, broken)."""
+    ids, unanchored = lint_acceptance_ids_for_spec(spec_path, anchored)
+    pointers, broken = lint_test_pointers_for_spec(spec_path)
+    return ids, unanchored, pointers, broken
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -208,18 +440,33 @@ def main() -> int:
 
     print(f"Found {len(spec_files)} spec(s): {', '.join(p.name for p in spec_files)}\n")
 
+    spec_workers = min(SPEC_WORKERS, len(spec_files))
+    # The spec reads overlap on a thread pool; their cached scans are reused below.
+    with ThreadPoolExecutor(max_workers=spec_workers) as pool:
+        all_ids = frozenset().union(*(ids for ids, _ in pool.map(_scan_spec, spec_files)))
+
+    # Scan the workspace once for the union of every spec's IDs. The thread
+    # pool is shut down first: a large scan forks worker processes, and
+    # forking while other threads are alive can deadlock the children.
+    anchored = find_anchored_ids(all_ids, list_anchor_files(SEARCH_PATHS))
+
+    # Lint specs concurrently; results are reported in spec order below.
+    # The basename index is built once up front rather than by every worker.
+    _basename_index()
+    with ThreadPoolExecutor(max_workers=spec_workers) as pool:
+        results = list(pool.map(lint_spec, spec_files, repeat(anchored)))
+
     failed = False
     total_ids = 0
     total_unanchored = 0
     total_pointers = 0
     total_broken = 0
 
-    for spec_path in spec_files:
+    for spec_path, (ids, unanchored, pointers, broken) in zip(spec_files, results):
         spec_name = spec_path.stem
         print(f"=== {spec_name} ===")
 
         # --- Lint 1: Acceptance ID anchoring ---
-        ids, unanchored = lint_acceptance_ids_for_spec(spec_path)
         total_ids += len(ids)
         total_unanchored += len(unanchored)
 
@@ -236,7 +483,6 @@ def main() -> int:
             print(f"    OK: all {len(ids)} anchored")
 
         # --- Lint 2: Claim pointer resolution ---
-        pointers, broken = lint_test_pointers_for_spec(spec_path)
         total_pointers += len(pointers)
         total_broken += len(broken)
 
@@ -10,16 +10,27 @@ Backend selection via MOC_LLM_BACKEND env var:
   - "local" (default): in-process Transformers (MOC_LOCAL_MODEL_PATH)
   - "ollama": local Ollama HTTP/CLI fallback
 
+Local backend tuning:
+  - MOC_LLM_COMPILE=1: torch.compile the model after loading
+  - MOC_LLM_QUANT=4bit|8bit: load bitsandbytes-quantized weights
+  - MOC_LLM_DTYPE=float16|bfloat16|float32: override the per-device weight dtype
+  - MOC_LLM_KV_QUANT=4bit|8bit: quantize the KV cache during generation
+  - MOC_LLM_BATCH=N: entries per batched generate() in augmented MOC runs
+
 Author: @darianrosebrook
 """
 
+import copy
+import functools
 import json
 import os
 import re
-import subprocess
-import urllib.error
-import urllib.request
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson  # optional: C JSON codec for the Ollama request/response bodies
+except ImportError:
+    orjson = None
 
 
 # Action verbs organized by content type
@@ -54,6 +65,19 @@ _VERBS_BY_TYPE: Dict[str, List[str]] = {
     "script": _SCRIPT_VERBS + _SHARED_ACTION_VERBS + _CODE_VERBS + _DOCUMENTATION_VERBS,
 }
 
+# Per-type alternation of the action verbs; .match() is the same test as
+# startswith() against each verb
+_ACTION_RE_BY_TYPE: Dict[str, "re.Pattern[str]"] = {
+    content_type: re.compile("|".join(re.escape(v) for v in verbs))
+    for content_type, verbs in _VERBS_BY_TYPE.items()
+}
+_SHARED_ACTION_RE = re.compile("|".join(re.escape(v) for v in _SHARED_ACTION_VERBS))
+
+# Whole-word code verb at the start of a thinking-trace sentence
+_THINKING_ACTION_RE = re.compile(
+    r"^\s*(%s)\b" % "|".join(re.escape(v) for v in _VERBS_BY_TYPE["code"])
+)
+
 _SKIP_PATTERNS = [
     "thinking", "let me", "i'll", "i will", "looking at", "based on",
     "the module", "the script", "the file", "this module",
@@ -63,6 +87,21 @@ _SKIP_PATTERNS = [
     "alright", "okay so", "let me generate", "generating",
 ]
 
+# One alternation over the skip patterns, searched on lowercased lines (same
+# test as checking each pattern with `in`, in a single regex pass)
+_SKIP_RE = re.compile("|".join(re.escape(p) for p in _SKIP_PATTERNS))
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Closed <think> blocks (removed before parsing), and an opening tag left over
+_THINK_BLOCK_RE = re.compile(r"<think>.*?</think>", re.DOTALL | re.IGNORECASE)
+_THINK_OPEN_RE = re.compile(r"<think>", re.IGNORECASE)
+
+_SENT_END_RE = re.compile(r"[.!?]\s+")
+
+# Keyword bonus for paragraph scoring, searched on the lowercased paragraph
+_PARAGRAPH_KEYWORD_RE = re.compile("implements|provides|defines|handles")
+
 _PREAMBLE_PREFIXES = [
     "The module ", "This module ", "The file ", "This file ",
     "This Python module ", "The Python module ",
@@ -77,6 +116,33 @@ _DEFAULT_LOCAL_MODEL_PATH = os.getenv(
 _LOCAL_MODEL = None
 _LOCAL_TOKENIZER = None
 _LOCAL_DEVICE = None
+_torch = None  # torch module, imported once by _load_local_model()
+
+# One keep-alive connection to the Ollama server, reused across calls.
+_OLLAMA_HOST = "127.0.0.1"
+_OLLAMA_PORT = 11434
+_OLLAMA_CONN = None
+
+# Prefilled KV caches for rendered system prefixes (prefix text -> (ids, cache)).
+# The system prompt is the same for every entry of a content type, so its
+# prefill is done once and each call only prefills its own user turn.
+_PREFIX_KV_CACHE: Dict[str, Tuple[Any, Any]] = {}
+_PREFIX_KV_CACHE_SIZE = 8
+# Stand-in user content used to find where the rendered system prefix ends
+_USER_MARKER = "\x00MOC_USER_TURN\x00"
+
+# Opt-in torch.compile of the local model's forward (MOC_LLM_COMPILE=1)
+_COMPILE_LOCAL_MODEL = os.getenv("MOC_LLM_COMPILE", "").strip() == "1"
+# Prompt lengths (tokens) generated once after compiling, so the dynamic-shape
+# recompile and CUDA graph capture happen before the first real request
+_COMPILE_WARMUP_LENGTHS = (256, 512)
+# On-disk Inductor cache so later runs reuse compiled kernels
+_INDUCTOR_CACHE_DIR = os.path.expanduser("~/.cache/moc_llm/inductor")
+
+# Release the allocator's unused cached blocks every N local generate() calls,
+# so varying prompt lengths don't fragment device memory over a long run
+_EMPTY_CACHE_EVERY = 32
+_LOCAL_GENERATE_CALLS = 0
 
 
 _ROLE_BY_CONTENT_TYPE = {
@@ -180,6 +246,8 @@ def call_llm(
         return api_response or None
 
     # CLI fallback
+    import subprocess
+
     try:
         result = subprocess.run(
             ["ollama", "run", model, "--nowordwrap"],
@@ -194,78 +262,186 @@ def call_llm(
         return None
 
 
-def _call_local_hf(
-    prompt: str,
-    system_prompt: str,
-    timeout: int,
-) -> Optional[str]:
-    """Generate using local in-process Transformers model."""
-    del timeout
-    global _LOCAL_MODEL, _LOCAL_TOKENIZER, _LOCAL_DEVICE
+def call_llm_batch(
+    pairs: List[Tuple[str, str]],
+    timeout: int = 180,
+    model: str = "olmo-3:latest",
+) -> List[Optional[str]]:
+    """call_llm() for several (prompt, system_prompt) pairs, in input order.
 
-    if _LOCAL_MODEL is None or _LOCAL_TOKENIZER is None:
-        try:
-            import torch
-            from transformers import AutoModelForCausalLM, AutoTokenizer
-        except Exception as e:
-            print(f"  Local model dependencies unavailable: {e}")
-            return None
+    The local backend runs them as one batched generate(); other backends
+    call one at a time.
+    """
+    backend = os.getenv("MOC_LLM_BACKEND", "local").strip().lower()
+    if backend in {"local", "transformers", "hf", "harness"} and len(pairs) > 1:
+        return _call_local_hf_batch(pairs)
+    return [call_llm(prompt, system_prompt, timeout=timeout, model=model) for prompt, system_prompt in pairs]
+
+
+def _load_local_model() -> bool:
+    """Load the local model and tokenizer once; returns False if unavailable."""
+    global _LOCAL_MODEL, _LOCAL_TOKENIZER, _LOCAL_DEVICE, _torch
+
+    if _LOCAL_MODEL is not None and _LOCAL_TOKENIZER is not None:
+        return True
+    if _COMPILE_LOCAL_MODEL:
+        # Inductor reads these when torch is first imported
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", _INDUCTOR_CACHE_DIR)
+        os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+    # Growable segments instead of fixed blocks; read by the CUDA allocator at import
+    os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+    try:
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+    except Exception as e:
+        print(f"  Local model dependencies unavailable: {e}")
+        return False
+    _torch = torch
 
-        model_path = _DEFAULT_LOCAL_MODEL_PATH
+    model_path = _DEFAULT_LOCAL_MODEL_PATH
+    try:
+        if torch.backends.mps.is_available():
+            _LOCAL_DEVICE = "mps"
+        elif torch.cuda.is_available():
+            _LOCAL_DEVICE = "cuda"
+        else:
+            _LOCAL_DEVICE = "cpu"
+
+        load_kwargs: Dict[str, Any] = {
+            "torch_dtype": _local_dtype(torch, _LOCAL_DEVICE),
+            "device_map": _LOCAL_DEVICE,
+        }
+        load_kwargs.update(_quantization_kwargs(torch))
+
+        _LOCAL_TOKENIZER = AutoTokenizer.from_pretrained(model_path)
         try:
-            if torch.backends.mps.is_available():
-                _LOCAL_DEVICE = "mps"
-            elif torch.cuda.is_available():
-                _LOCAL_DEVICE = "cuda"
-            else:
-                _LOCAL_DEVICE = "cpu"
-
-            _LOCAL_TOKENIZER = AutoTokenizer.from_pretrained(model_path)
             _LOCAL_MODEL = AutoModelForCausalLM.from_pretrained(
                 model_path,
-                torch_dtype=torch.float16 if _LOCAL_DEVICE in {"mps", "cuda"} else torch.float32,
-                device_map=_LOCAL_DEVICE,
                 low_cpu_mem_usage=True,
+                attn_implementation="sdpa",
+                **load_kwargs,
             )
-        except Exception as e:
-            print(f"  Failed to load local model at {model_path}: {e}")
-            _LOCAL_MODEL = None
-            _LOCAL_TOKENIZER = None
-            return None
+        except (TypeError, ValueError):
+            # transformers or model architecture without SDPA attention
+            _LOCAL_MODEL = AutoModelForCausalLM.from_pretrained(
+                model_path,
+                low_cpu_mem_usage=True,
+                **load_kwargs,
+            )
+    except Exception as e:
+        print(f"  Failed to load local model at {model_path}: {e}")
+        _LOCAL_MODEL = None
+        _LOCAL_TOKENIZER = None
+        return False
+
+    if _COMPILE_LOCAL_MODEL:
+        _compile_local_model()
+    return True
+
+
+@functools.lru_cache(maxsize=8)
+def _chat_template_parts(system_prompt: str) -> Optional[Tuple[str, str, bool]]:
+    """(prefix, suffix, exact) around the user content in the rendered chat, or None.
+
+    The template is rendered once per system prompt with a marker as the
+    user turn. exact is True when prefix + content + suffix reproduces a
+    real rendering, so prompts can be spliced in without re-rendering.
+    """
+    fallback = (
+        "<|im_start|>system\n"
+        f"{system_prompt}<|im_end|>\n"
+        "<|im_start|>user\n",
+        "<|im_end|>\n"
+        "<|im_start|>assistant\n",
+        True,
+    )
+
+    def render(content: str) -> str:
+        return _LOCAL_TOKENIZER.apply_chat_template(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": content},
+            ],
+            tokenize=False,
+            add_generation_prompt=True,
+        )
 
     try:
-        import torch
+        prefix, found, suffix = render(_USER_MARKER).partition(_USER_MARKER)
+        if not found:
+            return None
+        sample = "Describe this file."
+        exact = render(sample) == prefix + sample + suffix
+    except Exception:
+        return fallback
+    return prefix, suffix, exact
+
+
+def _render_chat(prompt: str, system_prompt: str) -> str:
+    """Render the system + user turns with the model's chat template."""
+    parts = _chat_template_parts(system_prompt)
+    # templates may trim content, so only splice prompts without edge whitespace
+    if parts is not None and parts[2] and prompt == prompt.strip() and _USER_MARKER not in prompt:
+        prefix, suffix, _ = parts
+        return prefix + prompt + suffix
+    try:
+        return _LOCAL_TOKENIZER.apply_chat_template(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            tokenize=False,
+            add_generation_prompt=True,
+        )
+    except Exception:
+        return (
+            "<|im_start|>system\n"
+            f"{system_prompt}<|im_end|>\n"
+            "<|im_start|>user\n"
+            f"{prompt}<|im_end|>\n"
+            "<|im_start|>assistant\n"
+        )
 
-        try:
-            full_prompt = _LOCAL_TOKENIZER.apply_chat_template(
-                [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                tokenize=False,
-                add_generation_prompt=True,
-            )
-        except Exception:
-            full_prompt = (
-                "<|im_start|>system\n"
-                f"{system_prompt}<|im_end|>\n"
-                "<|im_start|>user\n"
-                f"{prompt}<|im_end|>\n"
-                "<|im_start|>assistant\n"
-            )
 
+def _call_local_hf(
+    prompt: str,
+    system_prompt: str,
+    timeout: int,
+) -> Optional[str]:
+    """Generate using local in-process Transformers model."""
+    del timeout
+    if not _load_local_model():
+        return None
+
+    try:
+        full_prompt = _render_chat(prompt, system_prompt)
         inputs = _LOCAL_TOKENIZER(full_prompt, return_tensors="pt")
-        inputs = {k: v.to(_LOCAL_DEVICE) for k, v in inputs.items()}
         input_len = inputs["input_ids"].shape[1]
-
-        with torch.no_grad():
+        inputs = _to_local_device(inputs)
+
+        gen_kwargs = dict(_KV_QUANT_KWARGS)
+        if not gen_kwargs:
+            # a quantized cache is built by generate(), so it can't start from the prefix cache
+            try:
+                past_key_values = _prefix_past_key_values(
+                    _render_system_prefix(system_prompt), inputs["input_ids"]
+                )
+            except Exception:
+                past_key_values = None  # e.g. transformers without DynamicCache
+            if past_key_values is not None:
+                gen_kwargs["past_key_values"] = past_key_values
+        gen_kwargs["stopping_criteria"] = _json_stopping_criteria(input_len)
+
+        with _torch.no_grad():
             outputs = _LOCAL_MODEL.generate(
                 **inputs,
                 max_new_tokens=180,
                 do_sample=False,
                 pad_token_id=_LOCAL_TOKENIZER.eos_token_id,
+                **gen_kwargs,
             )
 
+        _release_cached_memory()
         new_tokens = outputs[0][input_len:]
         text = _LOCAL_TOKENIZER.decode(new_tokens, skip_special_tokens=True).strip()
         return text if text else None
@@ -274,6 +450,292 @@ def _call_local_hf(
         return None
 
 
+def _release_cached_memory() -> None:
+    """Empty the CUDA / MPS allocator cache every _EMPTY_CACHE_EVERY generate() calls."""
+    global _LOCAL_GENERATE_CALLS
+
+    _LOCAL_GENERATE_CALLS += 1
+    if _LOCAL_GENERATE_CALLS % _EMPTY_CACHE_EVERY:
+        return
+    if _LOCAL_DEVICE == "cuda":
+        _torch.cuda.empty_cache()
+    elif _LOCAL_DEVICE == "mps":
+        _torch.mps.empty_cache()
+
+
+def _to_local_device(encoding: Any) -> Any:
+    """Move a tokenizer BatchEncoding to the model device with async copies."""
+    try:
+        return encoding.to(_LOCAL_DEVICE, non_blocking=True)
+    except TypeError:
+        return encoding.to(_LOCAL_DEVICE)  # transformers without non_blocking
+
+
+def _json_stopping_criteria(input_len: int) -> Any:
+    """StoppingCriteriaList that ends a row once its {"description": ...} object is complete.
+
+    A row's generated text is only re-decoded when its newest token
+    contains "}". It then gets the same <think> and meta-commentary
+    filtering as parse_llm_response(), and JSON inside an unclosed <think>
+    block does not count. transformers >= 4.39 stops each row on its own;
+    older releases stop the batch once every row is done.
+    """
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    per_row = _per_row_stopping()
+
+    class _JsonDescriptionDone(StoppingCriteria):
+        def __init__(self) -> None:
+            self.done: List[bool] = []
+
+        def _row_done(self, row) -> bool:
+            if "}" not in _LOCAL_TOKENIZER.decode(row[-1:], skip_special_tokens=True):
+                return False
+            text = _LOCAL_TOKENIZER.decode(row[input_len:], skip_special_tokens=True)
+            if _THINK_OPEN_RE.search(_THINK_BLOCK_RE.sub("", text)):
+                return False  # still inside a <think> block
+            description = _find_json_description(_filter_meta_commentary(text))
+            return isinstance(description, str) and bool(description.strip())
+
+        def __call__(self, input_ids, scores, **kwargs) -> Any:
+            if not self.done:
+                self.done = [False] * input_ids.shape[0]
+            for i, row in enumerate(input_ids):
+                if not self.done[i]:
+                    self.done[i] = self._row_done(row)
+            if per_row:
+                return _torch.tensor(self.done, dtype=_torch.bool, device=input_ids.device)
+            return all(self.done)
+
+    return StoppingCriteriaList([_JsonDescriptionDone()])
+
+
+def _per_row_stopping() -> bool:
+    """Whether generate() takes a per-row bool tensor from stopping criteria (transformers >= 4.39)."""
+    import transformers
+
+    try:
+        major, minor = (int(part) for part in transformers.__version__.split(".")[:2])
+    except ValueError:
+        return False
+    return (major, minor) >= (4, 39)
+
+
+def _call_local_hf_batch(pairs: List[Tuple[str, str]]) -> List[Optional[str]]:
+    """Generate for several (prompt, system_prompt) pairs in one generate() call.
+
+    Prompts are left-padded so every row's new tokens start at the same
+    column; decode then streams the weights once per step for the batch.
+    Rows stop on the same JSON criterion as _call_local_hf(). The prefilled
+    system-prefix KV cache is not reused here: left padding puts the
+    prefix at a different offset in each row, so every batch prefills in
+    full.
+    """
+    if not _load_local_model():
+        return [None] * len(pairs)
+
+    try:
+        prompts = [_render_chat(prompt, system_prompt) for prompt, system_prompt in pairs]
+        # Pad on the left (with eos if the tokenizer has no pad token) for this
+        # call only; the shared tokenizer's settings are restored afterwards.
+        padding_side = _LOCAL_TOKENIZER.padding_side
+        pad_token = _LOCAL_TOKENIZER.pad_token
+        if pad_token is None:
+            _LOCAL_TOKENIZER.pad_token = _LOCAL_TOKENIZER.eos_token
+        _LOCAL_TOKENIZER.padding_side = "left"
+        try:
+            inputs = _LOCAL_TOKENIZER(prompts, return_tensors="pt", padding=True)
+            pad_token_id = _LOCAL_TOKENIZER.pad_token_id
+        finally:
+            _LOCAL_TOKENIZER.padding_side = padding_side
+            _LOCAL_TOKENIZER.pad_token = pad_token
+        input_len = inputs["input_ids"].shape[1]
+        inputs = _to_local_device(inputs)
+
+        with _torch.no_grad():
+            outputs = _LOCAL_MODEL.generate(
+                **inputs,
+                max_new_tokens=180,
+                do_sample=False,
+                pad_token_id=pad_token_id,
+                stopping_criteria=_json_stopping_criteria(input_len),
+                **_KV_QUANT_KWARGS,
+            )
+
+        _release_cached_memory()
+        texts = _LOCAL_TOKENIZER.batch_decode(outputs[:, input_len:], skip_special_tokens=True)
+        return [text.strip() or None for text in texts]
+    except Exception as e:
+        print(f"  Local batch generation error: {e}")
+        return [None] * len(pairs)
+
+
+def _local_dtype(torch, device: str) -> Any:
+    """Weight dtype for device, overridable with MOC_LLM_DTYPE=float16|bfloat16|float32.
+
+    MPS uses float16; CUDA and CPU use bfloat16 where supported, falling
+    back to float16 on CUDA and float32 on CPU.
+    """
+    dtypes = {
+        "float16": torch.float16,
+        "fp16": torch.float16,
+        "bfloat16": torch.bfloat16,
+        "bf16": torch.bfloat16,
+        "float32": torch.float32,
+        "fp32": torch.float32,
+    }
+    override = os.getenv("MOC_LLM_DTYPE", "").strip().lower()
+    if override in dtypes:
+        return dtypes[override]
+    if override:
+        print(f"  Ignoring unknown MOC_LLM_DTYPE={override!r} (expected float16, bfloat16 or float32)")
+
+    if device == "mps":
+        return torch.float16
+    if device == "cuda":
+        return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    try:
+        cpu_bf16 = torch.cpu.is_bf16_supported()
+    except AttributeError:
+        cpu_bf16 = False  # torch releases without torch.cpu.is_bf16_supported
+    return torch.bfloat16 if cpu_bf16 else torch.float32
+
+
+def _kv_quant_kwargs() -> Dict[str, Any]:
+    """generate() overrides for MOC_LLM_KV_QUANT=4bit|8bit (quantized KV cache), else {}.
+
+    4bit uses the quanto backend and 8bit uses HQQ; weights and attention
+    keep their load dtype.
+    """
+    kv_quant = os.getenv("MOC_LLM_KV_QUANT", "").strip().lower()
+    if not kv_quant:
+        return {}
+    if kv_quant == "4bit":
+        cache_config = {"backend": "quanto", "nbits": 4}
+    elif kv_quant == "8bit":
+        cache_config = {"backend": "HQQ", "nbits": 8}
+    else:
+        print(f"  Ignoring unknown MOC_LLM_KV_QUANT={kv_quant!r} (expected 4bit or 8bit)")
+        return {}
+    return {"cache_implementation": "quantized", "cache_config": cache_config}
+
+
+# Resolved once at import, so an unknown MOC_LLM_KV_QUANT is reported once per run
+_KV_QUANT_KWARGS = _kv_quant_kwargs()
+
+
+def _quantization_kwargs(torch) -> Dict[str, Any]:
+    """from_pretrained() overrides for MOC_LLM_QUANT=4bit|8bit (bitsandbytes), else {}.
+
+    4bit loads NF4 weights with double quantization and computes in
+    bfloat16 where the GPU supports it; 8bit uses LLM.int8(). Quantized
+    weights are placed with device_map="auto".
+    """
+    quant = os.getenv("MOC_LLM_QUANT", "").strip().lower()
+    if not quant:
+        return {}
+    if quant not in {"4bit", "8bit"}:
+        print(f"  Ignoring unknown MOC_LLM_QUANT={quant!r} (expected 4bit or 8bit)")
+        return {}
+    try:
+        from transformers import BitsAndBytesConfig
+    except Exception as e:
+        print(f"  Quantized load unavailable, loading full weights: {e}")
+        return {}
+
+    if quant == "4bit":
+        bf16 = torch.cuda.is_available() and torch.cuda.is_bf16_supported()
+        config = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_compute_dtype=torch.bfloat16 if bf16 else torch.float16,
+            bnb_4bit_use_double_quant=True,
+        )
+    else:
+        config = BitsAndBytesConfig(load_in_8bit=True)
+    return {"quantization_config": config, "device_map": "auto"}
+
+
+def _compile_local_model() -> None:
+    """Compile the loaded model's forward and warm it up; stays eager on failure.
+
+    CUDA uses "reduce-overhead" (CUDA graphs for the repeated decode step);
+    other devices use the default mode. Shapes are compiled dynamically
+    since prompt lengths vary per entry. A short generate() at each
+    _COMPILE_WARMUP_LENGTHS prompt length pays the static and dynamic-shape
+    compiles before the first real request; compiled kernels persist in
+    TORCHINDUCTOR_CACHE_DIR across runs.
+    """
+    mode = "reduce-overhead" if _LOCAL_DEVICE == "cuda" else "default"
+    eager_forward = _LOCAL_MODEL.forward
+    try:
+        _LOCAL_MODEL.forward = _torch.compile(eager_forward, mode=mode, fullgraph=False, dynamic=True)
+        with _torch.no_grad():
+            for length in _COMPILE_WARMUP_LENGTHS:
+                warmup = _LOCAL_TOKENIZER(
+                    "Warm up. " * length, return_tensors="pt", truncation=True, max_length=length
+                )
+                _LOCAL_MODEL.generate(
+                    **_to_local_device(warmup),
+                    max_new_tokens=8,
+                    do_sample=False,
+                    pad_token_id=_LOCAL_TOKENIZER.eos_token_id,
+                )
+    except Exception as e:
+        print(f"  torch.compile unavailable, using eager model: {e}")
+        _LOCAL_MODEL.forward = eager_forward
+
+
+def _render_system_prefix(system_prompt: str) -> Optional[str]:
+    """Rendered chat text before the user content, or None if it can't be isolated."""
+    parts = _chat_template_parts(system_prompt)
+    return parts[0] if parts is not None and parts[0] else None
+
+
+def _prefix_past_key_values(prefix: Optional[str], input_ids) -> Optional[Any]:
+    """Copy of the prefilled KV cache for prefix, for one generate() call.
+
+    Returns None (full prefill) unless the prefix tokens are an exact
+    leading slice of input_ids, so a tokenization that merges across the
+    prefix boundary never reuses a mismatched cache.
+    """
+    if prefix is None:
+        return None
+    from transformers import DynamicCache
+
+    entry = _PREFIX_KV_CACHE.get(prefix)
+    if entry is None:
+        prefix_ids = _LOCAL_TOKENIZER(prefix, return_tensors="pt")["input_ids"].to(_LOCAL_DEVICE)
+        with _torch.no_grad():
+            cache = _LOCAL_MODEL(
+                input_ids=prefix_ids, past_key_values=DynamicCache(), use_cache=True
+            ).past_key_values
+        if len(_PREFIX_KV_CACHE) >= _PREFIX_KV_CACHE_SIZE:
+            del _PREFIX_KV_CACHE[next(iter(_PREFIX_KV_CACHE))]
+        entry = _PREFIX_KV_CACHE[prefix] = (prefix_ids, cache)
+
+    prefix_ids, cache = entry
+    prefix_len = prefix_ids.shape[1]
+    if prefix_len >= input_ids.shape[1] or not _torch.equal(input_ids[:, :prefix_len], prefix_ids):
+        return None
+    # generate() extends the cache in place
+    return copy.deepcopy(cache)
+
+
+def _ollama_connection(timeout: int) -> Any:
+    """The shared keep-alive HTTPConnection to the Ollama server."""
+    global _OLLAMA_CONN
+    import http.client
+
+    if _OLLAMA_CONN is None:
+        _OLLAMA_CONN = http.client.HTTPConnection(_OLLAMA_HOST, _OLLAMA_PORT, timeout=timeout)
+    else:
+        _OLLAMA_CONN.timeout = timeout
+        if _OLLAMA_CONN.sock is not None:
+            _OLLAMA_CONN.sock.settimeout(timeout)
+    return _OLLAMA_CONN
+
+
 def _call_ollama_http(
     prompt: str,
     system_prompt: str,
@@ -281,6 +743,9 @@ def _call_ollama_http(
     model: str,
 ) -> Optional[str]:
     """Call local Ollama HTTP generate API."""
+    global _OLLAMA_CONN
+    import http.client
+
     payload = {
         "model": model,
         "prompt": prompt,
@@ -289,28 +754,53 @@ def _call_ollama_http(
         "options": {"temperature": 0.2, "top_p": 0.9, "num_predict": 180},
         "think": False,
     }
+    request_body = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode("utf-8")
 
-    req = urllib.request.Request(
-        "http://127.0.0.1:11434/api/generate",
-        data=json.dumps(payload).encode("utf-8"),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-
+    while True:
+        conn = _ollama_connection(timeout)
+        reused = conn.sock is not None
+        try:
+            conn.request(
+                "POST",
+                "/api/generate",
+                body=request_body,
+                headers={"Content-Type": "application/json"},
+            )
+            resp = conn.getresponse()
+            raw = resp.read()
+            break
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            _OLLAMA_CONN = None
+            # The server may drop an idle keep-alive socket; retry once on a fresh one.
+            stale = isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError))
+            if not (reused and stale):
+                return None
+
+    if resp.status != 200:
+        return None
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            body = resp.read().decode("utf-8", errors="replace")
-            data = json.loads(body)
-            text = (data.get("response") or "").strip()
-            if text:
-                return text
-            thinking = (data.get("thinking") or "").strip()
-            if thinking:
-                extracted = _extract_from_thinking(thinking)
-                return extracted or ""
-            return ""
-    except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError, json.JSONDecodeError):
+        data = _loads_ollama_body(raw)
+    except json.JSONDecodeError:
         return None
+    text = (data.get("response") or "").strip()
+    if text:
+        return text
+    thinking = (data.get("thinking") or "").strip()
+    if thinking:
+        extracted = _extract_from_thinking(thinking)
+        return extracted or ""
+    return ""
+
+
+def _loads_ollama_body(raw: bytes) -> Any:
+    """Parse a response body; orjson when available, else json with lossy UTF-8 decoding."""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # invalid UTF-8 or NaN literals: let json decide as before
+    return json.loads(raw.decode("utf-8", errors="replace"))
 
 
 def _extract_from_thinking(thinking: str) -> Optional[str]:
@@ -319,12 +809,10 @@ def _extract_from_thinking(thinking: str) -> Optional[str]:
     if quoted:
         return quoted[-1].strip()
 
-    verbs = get_action_verbs("code")
-    action = re.compile(r"^\s*(%s)\b" % "|".join(re.escape(v) for v in verbs))
     sentences = re.split(r"(?<=[.!?])\s+", thinking)
     candidates = [s.strip() for s in sentences if 20 <= len(s.strip()) <= 320]
     for sentence in reversed(candidates):
-        if action.match(sentence):
+        if _THINKING_ACTION_RE.match(sentence):
             return sentence
     if candidates:
         return candidates[-1]
@@ -335,22 +823,40 @@ def _filter_meta_commentary(response: str) -> str:
     """Remove thinking / meta-commentary lines."""
     if not response:
         return response
-    response = re.sub(r"<think>.*?</think>", "", response, flags=re.DOTALL | re.IGNORECASE)
-    lines = response.split("\n")
+    response = _THINK_BLOCK_RE.sub("", response)
     filtered: List[str] = []
     in_output_block = False
-    for line in lines:
-        lower_line = line.lower().strip()
-        if any(p in lower_line for p in _SKIP_PATTERNS) and not in_output_block:
+    for line in response.split("\n"):
+        if not in_output_block and _SKIP_RE.search(line.lower()):
             continue
-        if line.strip().startswith("OUTPUT:"):
+        stripped = line.strip()
+        if stripped.startswith("OUTPUT:"):
             in_output_block = True
-        elif line.strip() and line.strip()[0].isupper() and ":" in line[:20]:
+        elif stripped and stripped[0].isupper() and line.find(":", 0, 20) != -1:
             in_output_block = False
         filtered.append(line)
     return "\n".join(filtered).strip()
 
 
+def _find_json_description(response: str) -> Optional[str]:
+    """The "description" of the first JSON object in response that has one.
+
+    Decodes in place from each "{" with raw_decode, so nested objects and
+    values containing "}" parse correctly.
+    """
+    idx = response.find("{")
+    while idx != -1:
+        try:
+            data, _ = _JSON_DECODER.raw_decode(response, idx)
+        except json.JSONDecodeError:
+            pass
+        else:
+            if "description" in data:
+                return data["description"]
+        idx = response.find("{", idx + 1)
+    return None
+
+
 def parse_llm_response(
     response: str,
     content_type: str = "code",
@@ -362,10 +868,16 @@ def parse_llm_response(
     if not response:
         return None
 
-    action_verbs = get_action_verbs(content_type)
+    # Strategy 1: the JSON object the prompt asks for
+    if "}" in response:
+        description = _find_json_description(response)
+        if isinstance(description, str) and description.strip():
+            return description
+
+    action_re = _ACTION_RE_BY_TYPE.get(content_type, _SHARED_ACTION_RE)
     lines = response.split("\n")
 
-    # Strategy 1: consecutive lines starting with an action verb
+    # Strategy 2: consecutive lines starting with an action verb
     description_lines: List[str] = []
     collecting = False
     for line in lines:
@@ -374,8 +886,7 @@ def parse_llm_response(
             if collecting:
                 break
             continue
-        starts_with_verb = any(line_stripped.startswith(v) for v in action_verbs)
-        if starts_with_verb:
+        if action_re.match(line_stripped):
             collecting = True
             description_lines.append(line_stripped)
         elif collecting:
@@ -386,17 +897,6 @@ def parse_llm_response(
     if description_lines:
         return " ".join(description_lines)
 
-    # Strategy 2: JSON fallback
-    try:
-        if "{" in response and "}" in response:
-            json_match = re.search(r"\{[^}]+\}", response, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group())
-                if "description" in data:
-                    return data["description"]
-    except (json.JSONDecodeError, KeyError):
-        pass
-
     # Strategy 3: best-scoring paragraph
     paragraphs = response.split("\n\n")
     best_paragraph: Optional[str] = None
@@ -406,9 +906,9 @@ def parse_llm_response(
         if len(para) < 30 or len(para) > 800:
             continue
         score = len(para)
-        if any(para.startswith(v) for v in action_verbs):
+        if action_re.match(para):
             score += 200
-        if any(t in para.lower() for t in ["implements", "provides", "defines", "handles"]):
+        if _PARAGRAPH_KEYWORD_RE.search(para.lower()):
             score += 100
         if score > best_score:
             best_score = score
@@ -420,8 +920,7 @@ def parse_llm_response(
     for line in reversed(lines):
         line_stripped = line.strip()
         if line_stripped and 20 < len(line_stripped) < 500:
-            lower_line = line_stripped.lower()
-            if not any(p in lower_line for p in _SKIP_PATTERNS):
+            if not _SKIP_RE.search(line_stripped.lower()):
                 return line_stripped
     return None
 
@@ -430,11 +929,15 @@ def _truncate_at_sentence(text: str, max_chars: int) -> str:
     """Truncate text at a sentence boundary."""
     if len(text) <= max_chars:
         return text
-    sentence_ends = list(re.finditer(r"[.!?]\s+", text[:max_chars + 50]))
-    if sentence_ends:
-        for match in reversed(sentence_ends):
-            if match.end() <= max_chars:
-                return text[:match.end()].strip()
+    # Ends only grow, so stop at the first sentence end past max_chars. The
+    # search window still caps the whitespace run a match can absorb.
+    cut = 0
+    for match in _SENT_END_RE.finditer(text, 0, max_chars + 50):
+        if match.end() > max_chars:
+            break
+        cut = match.end()
+    if cut:
+        return text[:cut].strip()
     truncated = text[:max_chars]
     last_space = truncated.rfind(" ")
     if last_space > max_chars * 0.7:
@@ -468,6 +971,32 @@ def generate_description(
 ) -> Optional[str]:
     """End-to-end helper: call LLM -> parse -> clean."""
     raw = call_llm(prompt, system_prompt, timeout=timeout, model=model)
+    return _finish_description(raw, content_type, max_chars)
+
+
+def generate_descriptions(
+    requests: List[Tuple[str, str, str]],
+    timeout: int = 180,
+    model: str = "olmo-3:latest",
+    max_chars: int = 500,
+) -> List[Optional[str]]:
+    """generate_description() for (prompt, system_prompt, content_type) triples.
+
+    The LLM calls go out as one batch (see call_llm_batch); results are in
+    input order.
+    """
+    raws = call_llm_batch(
+        [(prompt, system_prompt) for prompt, system_prompt, _ in requests],
+        timeout=timeout, model=model,
+    )
+    return [
+        _finish_description(raw, content_type, max_chars)
+        for raw, (_, _, content_type) in zip(raws, requests)
+    ]
+
+
+def _finish_description(raw: Optional[str], content_type: str, max_chars: int) -> Optional[str]:
+    """Parse and clean raw LLM output; None if nothing usable remains."""
     if raw is None:
         return None
     parsed = parse_llm_response(raw, content_type=content_type)
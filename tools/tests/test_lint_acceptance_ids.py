@@ -0,0 +1,98 @@
+"""Tests for tools/lint_acceptance_ids.py.
+
+Run with: python3 -m unittest discover -s tools/tests
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import lint_acceptance_ids  # noqa: E402
+
+SPEC = """\
+id: T-001
+acceptance:
+  - id: S1-M1-ANCHORED
+  - id: S1-M2-MISSING
+pointers:
+  tests:
+    - "probe.rs::probe_test"
+"""
+
+SOURCE = """\
+// ACCEPTANCE: S1-M1-ANCHORED
+#[test]
+fn probe_test() {}
+"""
+
+
+def _clear_caches() -> None:
+    for value in vars(lint_acceptance_ids).values():
+        if hasattr(value, "cache_clear"):
+            value.cache_clear()
+
+
+class MainParallelScanTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        (root / ".caws/specs").mkdir(parents=True)
+        (root / ".caws/specs/T-001.yaml").write_text(SPEC)
+        (root / "kernel/src").mkdir(parents=True)
+        (root / "kernel/src/probe.rs").write_text(SOURCE)
+
+        cwd = os.getcwd()
+        os.chdir(root)
+        self.addCleanup(os.chdir, cwd)
+        _clear_caches()
+        self.addCleanup(_clear_caches)
+
+    def test_main_takes_process_pool_path_with_no_other_threads(self) -> None:
+        live_threads = []
+
+        class RecordingPool(lint_acceptance_ids.ProcessPoolExecutor):
+            def __init__(self, *args, **kwargs):
+                live_threads.append(threading.active_count())
+                super().__init__(*args, **kwargs)
+
+        out = io.StringIO()
+        with mock.patch.object(lint_acceptance_ids, "PARALLEL_SCAN_MIN_BYTES", 0), \
+                mock.patch.object(lint_acceptance_ids, "ProcessPoolExecutor", RecordingPool), \
+                mock.patch("os.cpu_count", return_value=2), \
+                contextlib.redirect_stdout(out):
+            rc = lint_acceptance_ids.main()
+
+        # The pool was started from main(), with only the main thread alive
+        self.assertEqual(live_threads, [1])
+        self.assertEqual(rc, 1)
+        report = out.getvalue()
+        self.assertIn("- S1-M2-MISSING", report)
+        self.assertNotIn("- S1-M1-ANCHORED", report)
+        self.assertIn("OK: all 1 resolve", report)
+
+
+class IdMatcherTest(unittest.TestCase):
+    def test_ids_straddling_scan_windows_are_found(self) -> None:
+        ids = {"S1-M1-EDGE", "S1-M22-LONGER-ID"}
+        scan = lint_acceptance_ids.build_id_matcher(ids)
+        chunk = 64
+        for aid in sorted(ids):
+            for offset in range(1, len(aid)):
+                pad = b"x" * (chunk - offset - 1)
+                buf = pad + f" {aid} ".encode() + b"y" * chunk
+                with self.subTest(aid=aid, offset=offset), \
+                        mock.patch.object(lint_acceptance_ids, "SCAN_CHUNK_BYTES", chunk):
+                    self.assertEqual(scan(buf), {aid})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tests for tools/lint_docs.py.
+
+Run with: python3 -m unittest discover -s tools/tests
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import lint_docs  # noqa: E402
+
+# Text that trips at least one banned pattern; every pattern must be hit by one
+SEEDS = [
+    "Notes live in ephemeral docs for now.",
+    "See the Ephemeral\tPlan and the ephemeral session log.",
+    "This page is a work in progress.",
+    "Work-In-Progress: do not cite.",
+    "workinprogress",
+    "## Status: Draft",
+    "intro\n  # An early draft\n",
+    "> This is a draft document.",
+    "Operators run in Stage K before Stage M.",
+    "Legacy Structural/Meaning/Pragmatic labels.",
+    "Each rule names its implementation anchor.",
+    "Defined in src/lib.rs.",
+    "Raised at lint.py:42.",
+]
+
+# Characters Python's Unicode-aware \s and \d accept beyond ASCII
+WIDENED = {
+    " ": ["\t", "\n", "\v", "\x1c", "\x85", "\xa0", "\u2003", "\u202f", "\u3000"],
+    "2": ["\u0663", "\u096b", "\uff12"],
+    "-": [" ", ""],
+}
+# Characters IGNORECASE accepts for a letter beyond its plain swapcase
+CASELESS = {
+    "i": ["I", "\u0130", "\u0131"],
+    "I": ["i", "\u0130", "\u0131"],
+    "s": ["S", "\u017f"],
+    "k": ["K", "\u212a"],
+    "K": ["k", "\u212a"],
+}
+NOISE = ["", "_", "x", "\xe9", "\n", "/", "#", ">", " "]
+
+
+def _mutations(seed: str, ignorecase: bool, rng: random.Random, count: int) -> list[str]:
+    samples = []
+    for _ in range(count):
+        out = []
+        for ch in seed:
+            choices = WIDENED.get(ch, [])
+            if ignorecase:
+                choices = choices + CASELESS.get(ch, [ch.swapcase()])
+            if choices and rng.random() < 0.5:
+                ch = rng.choice(choices)
+            if rng.random() < 0.05:
+                ch += rng.choice(NOISE)
+            out.append(ch)
+        samples.append("".join(out))
+    return samples
+
+
+def _positives(pattern, rng: random.Random) -> list[str]:
+    """Samples `pattern` matches: the seeds it hits and their variants."""
+    ignorecase = bool(pattern.flags & lint_docs.re.IGNORECASE)
+    samples = [seed for seed in SEEDS if pattern.search(seed)]
+    for seed in list(samples):
+        samples.extend(_mutations(seed, ignorecase, rng, 300))
+    return [sample for sample in samples if pattern.search(sample)]
+
+
+@unittest.skipIf(lint_docs.re2 is None, "google-re2 not installed")
+class BannedScreenSupersetTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(0)
+        self.positives = {
+            pattern: _positives(pattern, rng)
+            for banned in lint_docs.AUTHORITY_BANNED_TERMS.values()
+            for pattern, _ in banned
+        }
+
+    def test_screen_matches_wherever_a_banned_pattern_does(self) -> None:
+        for authority, banned in lint_docs.AUTHORITY_BANNED_TERMS.items():
+            screen = lint_docs.BANNED_SCREENS[authority]
+            for pattern, _ in banned:
+                superset = lint_docs.re2.compile(lint_docs._re2_superset(pattern))
+                positives = self.positives[pattern]
+                self.assertGreaterEqual(len(positives), 50, pattern.pattern)
+                for sample in positives:
+                    with self.subTest(pattern=pattern.pattern, sample=sample):
+                        self.assertIsNotNone(superset.search(sample))
+                        self.assertIsNotNone(screen.search(sample))
+
+    def test_find_banned_terms_agrees_with_unscreened_scan(self) -> None:
+        samples = [sample for positives in self.positives.values() for sample in positives]
+        for authority, banned in lint_docs.AUTHORITY_BANNED_TERMS.items():
+            for sample in samples:
+                expected = [reason for pattern, reason in banned if pattern.search(sample)]
+                with self.subTest(authority=authority, sample=sample):
+                    self.assertEqual(lint_docs.find_banned_terms(authority, sample), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()